@@ -1,4 +1,28 @@
 """Utilities for generating musical inspiration from MIDI files."""
 
-from .analysis import extract_features  # noqa: F401
-from .ideas import InspirationGenerator  # noqa: F401
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .analysis import extract_features
+    from .ideas import InspirationGenerator
+
+__all__ = ["InspirationGenerator", "extract_features"]
+
+# Public names resolved on first access (PEP 562) so that importing the package,
+# e.g. for ``python -m midi_inspo --help``, does not load the analysis code.
+_LAZY_ATTRS = {
+    "extract_features": ".analysis",
+    "InspirationGenerator": ".ideas",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
-import argparse
+import glob
+import os
 import sys
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable, List
 
-from .analysis import MidiFeatureError, extract_features
-from .ideas import InspirationGenerator
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import argparse
 
 
 def build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Generate musical inspiration from MIDI files")
     parser.add_argument("midi_file", nargs="?", help="Path to the MIDI file to analyze")
     parser.add_argument(
@@ -23,6 +26,23 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Include the raw feature JSON in the output",
     )
+    parser.add_argument(
+        "--batch",
+        metavar="PATH",
+        help="Analyze every MIDI file in a directory, or all files matching a glob pattern",
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Parse the MIDI file(s) without reading or writing the feature cache",
+    )
+    cache.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Re-parse the MIDI file(s) and overwrite their feature cache entries",
+    )
     parser.add_argument(
         "--ui",
         action="store_true",
@@ -31,26 +51,76 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def expand_batch(pattern: str) -> List[str]:
+    """Return the MIDI files in a directory, or the files matching a glob."""
+
+    if os.path.isdir(pattern):
+        candidates = [
+            os.path.join(pattern, name)
+            for name in os.listdir(pattern)
+            if name.lower().endswith((".mid", ".midi"))
+        ]
+    else:
+        candidates = glob.glob(pattern, recursive=True)
+    # Directories, FIFOs and other special files are skipped; opening a FIFO
+    # would block the whole batch.
+    return sorted(path for path in candidates if os.path.isfile(path))
+
+
 def run_cli(args: argparse.Namespace) -> int:
     if args.ui:
         return launch_ui()
 
-    if not args.midi_file:
-        raise SystemExit("error: midi_file is required unless --ui is specified")
-
-    try:
-        features = extract_features(args.midi_file)
-    except MidiFeatureError as exc:
-        print(f"Error extracting features: {exc}", file=sys.stderr)
-        return 1
-
-    generator = InspirationGenerator(features)
-    ideas = generator.generate_ideas(
-        show_features=args.show_features,
-        show_json=args.show_json,
-    )
-    print(ideas)
-    return 0
+    if args.batch and args.midi_file:
+        raise SystemExit("error: midi_file and --batch cannot be combined")
+    if not args.midi_file and not args.batch:
+        raise SystemExit("error: midi_file is required unless --ui or --batch is specified")
+
+    from .analysis import MidiFeatureError, extract_features, extract_features_many
+    from .ideas import InspirationGenerator
+
+    if args.batch:
+        paths = expand_batch(args.batch)
+        if not paths:
+            print(f"No MIDI files found for: {args.batch}", file=sys.stderr)
+            return 1
+        results = extract_features_many(
+            paths,
+            use_cache=args.use_cache,
+            refresh_cache=args.refresh_cache,
+            return_exceptions=True,
+        )
+    else:
+        paths = [args.midi_file]
+        try:
+            results = [
+                extract_features(
+                    args.midi_file,
+                    use_cache=args.use_cache,
+                    refresh_cache=args.refresh_cache,
+                )
+            ]
+        except MidiFeatureError as exc:
+            results = [exc]
+
+    exit_code = 0
+    for index, (path, features) in enumerate(zip(paths, results)):
+        if args.batch:
+            if index:
+                print()
+            print(f"== {path} ==")
+        if isinstance(features, MidiFeatureError):
+            source = f" from {path}" if args.batch else ""
+            print(f"Error extracting features{source}: {features}", file=sys.stderr)
+            exit_code = 1
+            continue
+        generator = InspirationGenerator(features)
+        ideas = generator.generate_ideas(
+            show_features=args.show_features,
+            show_json=args.show_json,
+        )
+        print(ideas)
+    return exit_code
 
 
 def launch_ui() -> int:
@@ -65,8 +135,13 @@ def launch_ui() -> int:
 
 
 def main(argv: Iterable[str] | None = None) -> int:
+    argv = list(argv) if argv is not None else sys.argv[1:]
+    # A bare ``--ui`` needs none of the argument parser, so skip building it.
+    if argv == ["--ui"]:
+        return launch_ui()
+
     parser = build_parser()
-    args = parser.parse_args(list(argv) if argv is not None else None)
+    args = parser.parse_args(argv)
     return run_cli(args)
 
 
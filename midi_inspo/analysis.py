@@ -2,158 +2,413 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import struct
-from typing import Dict, List
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import compress
+from typing import Dict, Iterable, List, Optional, Union
+
+try:  # Optional C-accelerated serializer.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+_U32 = struct.Struct(">I")
+_HDR = struct.Struct(">HHH")
+_CHUNK = struct.Struct(">4sI")
+
+# Bump whenever the parser or the feature dictionary changes so that stale
+# cache entries are ignored.
+_CACHE_VERSION = 1
+
+# Upper bound on the number of files handed to a batch worker at once; it is
+# also how far ahead read-ahead hints are issued.
+_MAX_BATCH_SIZE = 16
+
+
+# Sentinels in _EVENT_KIND. Note-on events (two data bytes) get their own kind
+# because they are both the most common event and the only one inspected
+# further; meta events have their length encoded in the stream.
+_NOTE_ON = 3
+_META_EVENT = 0xFF
+
+
+def _event_kind(status: int) -> int:
+    command = status & 0xF0
+    if command == 0x90:
+        return _NOTE_ON
+    if command in (0x80, 0xA0, 0xB0, 0xE0):
+        return 2
+    if command in (0xC0, 0xD0):
+        return 1
+    if status == 0xFF:
+        return _META_EVENT
+    return 0
+
+
+# Event kind for each status byte: the number of data bytes that follow it, or
+# one of the sentinels above.
+_EVENT_KIND = bytes(_event_kind(status) for status in range(256))
 
 
 class MidiFeatureError(RuntimeError):
     """Raised when feature extraction fails."""
 
 
-def _read_chunk(stream) -> tuple[str, bytes]:
-    header = stream.read(8)
-    if len(header) < 8:
+def _read_chunk(data: bytes, pos: int) -> tuple[bytes, int, int]:
+    """Locate the chunk starting at ``pos``.
+
+    Returns the chunk name and the start and end offsets of its data in
+    ``data``; the end offset is also where the next chunk begins.
+    """
+
+    start = pos + 8
+    if start > len(data):
         raise MidiFeatureError("Unexpected end of file while reading chunk header")
-    name = header[:4].decode("ascii", errors="replace")
-    length = struct.unpack(">I", header[4:])[0]
-    data = stream.read(length)
-    if len(data) < length:
+    name, length = _CHUNK.unpack_from(data, pos)
+    end = start + length
+    if end > len(data):
         raise MidiFeatureError("Unexpected end of file while reading chunk data")
-    return name, data
+    return name, start, end
+
+
+def _parse_track(data: bytes, start: int, end: int, seen_status: bytearray) -> int:
+    """Walk the events of the ``MTrk`` chunk stored in ``data[start:end]``.
+
+    Returns the number of note-on events with a non-zero velocity. Every status
+    byte encountered is flagged in ``seen_status``, a 256-entry table indexed by
+    status byte.
+    """
+
+    # Bind module-level tables to locals; they are read on every event.
+    event_kind = _EVENT_KIND
+    note_on = _NOTE_ON
+    meta_event = _META_EVENT
+    note_ons = 0
+    idx = start
+    prev_status = None
+    while idx < end:
+        # Skip delta time (variable-length quantity). Its value is not needed,
+        # and most deltas fit in a single byte, so only continuation bytes loop.
+        delta_byte = data[idx]
+        idx += 1
+        while delta_byte & 0x80 and idx < end:
+            delta_byte = data[idx]
+            idx += 1
+
+        if idx >= end:
+            break
+        status = data[idx]
+        if status < 0x80:
+            if prev_status is None:
+                break
+            status = prev_status
+            data_start = idx
+        else:
+            idx += 1
+            data_start = idx
+            prev_status = status
+
+        seen_status[status] = 1
 
+        kind = event_kind[status]
+        if kind == note_on:
+            idx = data_start + 2
+            if data_start + 1 < end and data[data_start + 1]:
+                note_ons += 1
+        elif kind == meta_event:
+            # Skip the meta type byte, then the length-prefixed payload.
+            if data_start >= end:
+                break
+            data_start += 1
+            idx = data_start
+            if idx >= end:
+                break
+            length = data[idx]
+            idx += 1
+            if length & 0x80:
+                length &= 0x7F
+                while idx < end:
+                    length_byte = data[idx]
+                    idx += 1
+                    length = (length << 7) | (length_byte & 0x7F)
+                    if not length_byte & 0x80:
+                        break
+            idx += length
+        else:
+            idx = data_start + kind
+
+    return note_ons
+
+
+def _parse_tracks(data: bytes, pos: int) -> tuple[List[int], List[int], bytearray, int]:
+    """Parse the track chunks that follow the header.
+
+    Returns the per-track lengths and note-on counts, the seen-status table and
+    the total number of note-on events.
+    """
+
+    track_lengths: List[int] = []
+    note_on_events: List[int] = []
+    seen_status = bytearray(256)
+    total_note_ons = 0
+    while True:
+        try:
+            chunk_name, start, pos = _read_chunk(data, pos)
+        except MidiFeatureError:
+            break
+        except Exception as exc:  # pragma: no cover - defensive
+            raise MidiFeatureError(str(exc)) from exc
+
+        if chunk_name != b"MTrk":
+            # Ignore non-track chunks (rare but valid extension chunks).
+            continue
+
+        note_ons = _parse_track(data, start, pos, seen_status)
+        track_lengths.append(pos - start)
+        note_on_events.append(note_ons)
+        total_note_ons += note_ons
+
+    return track_lengths, note_on_events, seen_status, total_note_ons
+
+
+def _parse_file(path: str) -> Dict[str, object]:
+    """Parse ``path`` and build the feature dictionary, bypassing the cache."""
+
+    # MIDI files are small, so a single read beats per-chunk reads or an mmap;
+    # the parser then works on offsets into this one buffer without copying.
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except OSError as exc:
+        raise MidiFeatureError(f"Unable to read MIDI file {path}: {exc.strerror or exc}") from exc
+
+    size = len(data)
+    if size < 14:
+        raise MidiFeatureError("File too small to be a valid MIDI file")
+    if data[:4] != b"MThd":
+        raise MidiFeatureError("Missing MIDI header chunk (MThd)")
+
+    declared_length = _U32.unpack_from(data, 4)[0]
+    format_type, num_tracks_declared, division_raw = _HDR.unpack_from(data, 8)
+
+    # Skip to the end of the declared header to continue parsing tracks.
+    track_lengths, note_on_events, seen_status, total_note_ons = _parse_tracks(
+        data, 8 + max(declared_length, 6)
+    )
 
-def extract_features(path: str) -> Dict[str, object]:
+    tracks_observed = len(track_lengths)
+    return {
+        "format_type": format_type,
+        "tracks_declared": num_tracks_declared,
+        "division": division_raw,
+        "track_lengths": track_lengths,
+        "note_on_events": note_on_events,
+        # Selecting the flagged indices in order yields the list already sorted.
+        "distinct_status_bytes": list(compress(range(256), seen_status)),
+        "file_size": size,
+        "tracks_observed": tracks_observed,
+        "track_consistency": tracks_observed == num_tracks_declared,
+        "density": total_note_ons / tracks_observed if tracks_observed else 0,
+    }
+
+
+def _cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "midi-inspo")
+
+
+def _cache_path(path: str) -> str:
+    """Return the cache file for ``path``, keyed by location, size and mtime."""
+
+    stat = os.stat(path)
+    key = f"{_CACHE_VERSION}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(_cache_dir(), f"{digest}.json")
+
+
+def _load_cached(cache_path: str) -> Optional[Dict[str, object]]:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(cache_path: str, features: Dict[str, object]) -> None:
+    # The cache is best effort: an unwritable cache directory must never make
+    # feature extraction fail.
+    try:
+        directory = os.path.dirname(cache_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(features, handle)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+def extract_features(
+    path: str, *, use_cache: bool = True, refresh_cache: bool = False
+) -> Dict[str, object]:
     """Extract lightweight, general MIDI features.
 
     The implementation is intentionally minimal to avoid heavy dependencies.
     It inspects the MIDI header and track chunks to build a summary that can be
     used by other components of the package.
+
+    Results are cached as JSON under ``$XDG_CACHE_HOME/midi-inspo`` (defaulting
+    to ``~/.cache/midi-inspo``), keyed by the file's path, size and
+    modification time. Pass ``use_cache=False`` to always parse the file
+    without touching the cache, or ``refresh_cache=True`` to parse it and
+    overwrite any existing entry (useful when a file was replaced without its
+    size or modification time changing).
     """
 
     if not os.path.exists(path):
         raise MidiFeatureError(f"MIDI file not found: {path}")
 
-    with open(path, "rb") as handle:
-        header = handle.read(14)
-        if len(header) < 14:
-            raise MidiFeatureError("File too small to be a valid MIDI file")
-        if header[:4] != b"MThd":
-            raise MidiFeatureError("Missing MIDI header chunk (MThd)")
-
-        declared_length = struct.unpack(">I", header[4:8])[0]
-        if declared_length != 6:
-            # Skip to the end of the declared header to continue parsing tracks.
-            handle.read(declared_length - 6)
-
-        format_type = struct.unpack(">H", header[8:10])[0]
-        num_tracks_declared = struct.unpack(">H", header[10:12])[0]
-        division_raw = struct.unpack(">H", header[12:14])[0]
-
-        # Parse track chunks sequentially.
-        track_lengths: List[int] = []
-        note_on_events: List[int] = []
-        distinct_status_bytes: set[int] = set()
-        while True:
-            try:
-                chunk_name, chunk_data = _read_chunk(handle)
-            except MidiFeatureError:
-                break
-            except Exception as exc:  # pragma: no cover - defensive
-                raise MidiFeatureError(str(exc)) from exc
+    if not use_cache:
+        return _parse_file(path)
+
+    try:
+        cache_path = _cache_path(path)
+    except OSError as exc:
+        raise MidiFeatureError(f"Unable to read MIDI file {path}: {exc.strerror or exc}") from exc
+    features = None if refresh_cache else _load_cached(cache_path)
+    if features is None:
+        features = _parse_file(path)
+        _store_cached(cache_path, features)
+    return features
+
+
+def _default_workers() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _extract_or_error(
+    path: str, *, use_cache: bool, refresh_cache: bool, return_exceptions: bool
+) -> Union[Dict[str, object], MidiFeatureError]:
+    try:
+        return extract_features(path, use_cache=use_cache, refresh_cache=refresh_cache)
+    except MidiFeatureError as exc:
+        if return_exceptions:
+            return exc
+        raise
+
 
-            if chunk_name != "MTrk":
-                # Ignore non-track chunks (rare but valid extension chunks).
+def _prefetch(paths: List[str]) -> None:
+    """Ask the kernel to start reading ``paths`` in the background.
+
+    Issuing the hints for a whole batch up front lets the storage queue work on
+    many files at once while earlier ones are being parsed. This is a no-op on
+    platforms without ``posix_fadvise``.
+    """
+
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            # O_NONBLOCK keeps a FIFO from blocking the open indefinitely.
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _uncached(paths: List[str]) -> List[str]:
+    """Return the paths in ``paths`` that have no feature cache entry yet."""
+
+    missing = []
+    for path in paths:
+        try:
+            if os.path.exists(_cache_path(path)):
                 continue
+        except OSError:
+            # Unreadable or vanished; extract_features reports the error.
+            continue
+        missing.append(path)
+    return missing
 
-            track_lengths.append(len(chunk_data))
-            status_counts = 0
-            idx = 0
-            prev_status = None
-            while idx < len(chunk_data):
-                # Skip delta time (variable-length quantity)
-                delta = 0
-                while idx < len(chunk_data):
-                    delta_byte = chunk_data[idx]
-                    idx += 1
-                    delta = (delta << 7) | (delta_byte & 0x7F)
-                    if not delta_byte & 0x80:
-                        break
 
-                if idx >= len(chunk_data):
-                    break
-                status = chunk_data[idx]
-                if status < 0x80:
-                    if prev_status is None:
-                        break
-                    status = prev_status
-                    data_start = idx
-                else:
-                    idx += 1
-                    data_start = idx
-                    prev_status = status
-
-                channel = status & 0x0F
-                command = status & 0xF0
-                distinct_status_bytes.add(status)
-
-                if command in (0x80, 0x90, 0xA0, 0xB0, 0xE0):
-                    data_length = 2
-                elif command in (0xC0, 0xD0):
-                    data_length = 1
-                elif status == 0xFF:
-                    data_length = 0
-                    if data_start >= len(chunk_data):
-                        break
-                    meta_type = chunk_data[data_start]
-                    data_start += 1
-                    idx = data_start
-                    length = 0
-                    while idx < len(chunk_data):
-                        length_byte = chunk_data[idx]
-                        idx += 1
-                        length = (length << 7) | (length_byte & 0x7F)
-                        if not length_byte & 0x80:
-                            break
-                    idx += length
-                    continue
-                else:
-                    data_length = 0
-
-                idx = data_start + data_length
-
-                if command == 0x90:
-                    velocity = chunk_data[data_start + 1] if data_length == 2 and data_start + 1 < len(chunk_data) else 0
-                    if velocity > 0:
-                        status_counts += 1
-
-            note_on_events.append(status_counts)
-
-        features = {
-            "format_type": format_type,
-            "tracks_declared": num_tracks_declared,
-            "division": division_raw,
-            "track_lengths": track_lengths,
-            "note_on_events": note_on_events,
-            "distinct_status_bytes": sorted(distinct_status_bytes),
-            "file_size": os.path.getsize(path),
-        }
-
-    features["tracks_observed"] = len(features["track_lengths"])
-    features["track_consistency"] = (
-        features["tracks_observed"] == features["tracks_declared"]
-    )
-    features["density"] = (
-        sum(features["note_on_events"]) / features["tracks_observed"]
-        if features["tracks_observed"]
-        else 0
+def _extract_batch(
+    paths: List[str], *, use_cache: bool, refresh_cache: bool, return_exceptions: bool
+) -> List[Union[Dict[str, object], MidiFeatureError]]:
+    # Cache hits never read the MIDI file, so only the misses are worth a hint.
+    _prefetch(_uncached(paths) if use_cache and not refresh_cache else paths)
+    return [
+        _extract_or_error(
+            path,
+            use_cache=use_cache,
+            refresh_cache=refresh_cache,
+            return_exceptions=return_exceptions,
+        )
+        for path in paths
+    ]
+
+
+def extract_features_many(
+    paths: Iterable[str],
+    *,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+    return_exceptions: bool = False,
+) -> List[Union[Dict[str, object], MidiFeatureError]]:
+    """Extract features for several MIDI files using a pool of processes.
+
+    Results are returned in the same order as ``paths``. ``workers`` defaults to
+    the number of CPUs available to this process. ``use_cache`` and
+    ``refresh_cache`` behave as in :func:`extract_features`. By default the first
+    :class:`MidiFeatureError` is propagated; with ``return_exceptions=True`` the
+    error is placed in the result list instead so the other files still succeed.
+    """
+
+    paths = list(paths)
+    extract = partial(
+        _extract_batch,
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
+        return_exceptions=return_exceptions,
     )
+    workers = min(workers or _default_workers(), len(paths))
+    if workers <= 1:
+        batch_size = _MAX_BATCH_SIZE
+    else:
+        # Large batches amortise the inter-process overhead; keep several per
+        # worker so that uneven file sizes still balance out.
+        batch_size = max(1, min(_MAX_BATCH_SIZE, len(paths) // (workers * 4)))
+    batches = [paths[start : start + batch_size] for start in range(0, len(paths), batch_size)]
 
-    return features
+    if workers <= 1:
+        return [result for batch in batches for result in extract(batch)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [result for batch in executor.map(extract, batches) for result in batch]
 
 
 def features_to_json(features: Dict[str, object]) -> str:
-    """Return a JSON representation of extracted features."""
+    """Return a JSON representation of extracted features.
+
+    Uses :mod:`orjson` when it is installed and falls back to :mod:`json`
+    otherwise; both produce the same two-space indented, key-sorted layout.
+    """
 
+    if orjson is not None:
+        return orjson.dumps(features, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode()
     return json.dumps(features, indent=2, sort_keys=True)
@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
-import json
-import random
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from typing import TYPE_CHECKING, Dict, Iterable, Sequence
 
-from .analysis import features_to_json
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import random
+
+
+_CREATIVE_DIRECTIONS = (
+    "Transform the harmonic rhythm by extending progressions over multiple bars.",
+    "Use call-and-response motifs between melodic voices for dialogue.",
+    "Swap a track's instrumentation with an unexpected timbre to spark a new vibe.",
+)
 
 
 @dataclass
@@ -19,14 +25,14 @@ class InspirationContext:
         fmt = self.features.get("format_type")
         division = self.features.get("division")
         density = self.features.get("density", 0)
-        segments = [
-            f"Format {fmt} with {tracks} track{'s' if tracks != 1 else ''}",
-            f"Timing division: {division}",
-            f"Average note density: {density:.2f}",
-        ]
+        structure = (
+            f"Format {fmt} with {tracks} track{'s' if tracks != 1 else ''}; "
+            f"Timing division: {division}; "
+            f"Average note density: {density:.2f}"
+        )
         if not self.features.get("track_consistency", True):
-            segments.append("Declared track count does not match observed data")
-        return "; ".join(segments)
+            structure += "; Declared track count does not match observed data"
+        return structure
 
     def suggested_focus(self) -> str:
         density = self.features.get("density", 0)
@@ -50,9 +56,13 @@ class InspirationGenerator:
 
     def __init__(self, features: Dict[str, object], *, rng: random.Random | None = None):
         self.context = InspirationContext(features)
-        self._rng = rng or random.Random()
+        self._rng = rng
 
-    def _choice(self, options: List[str]) -> str:
+    def _choice(self, options: Sequence[str]) -> str:
+        if self._rng is None:
+            import random
+
+            self._rng = random.Random()
         return self._rng.choice(options)
 
     def generate_ideas(self, *, show_features: bool = False, show_json: bool = False) -> str:
@@ -62,22 +72,19 @@ class InspirationGenerator:
             context.describe_structure(),
             "",
             "✨ Creative Directions",
-            self._choice(
-                [
-                    "Transform the harmonic rhythm by extending progressions over multiple bars.",
-                    "Use call-and-response motifs between melodic voices for dialogue.",
-                    "Swap a track's instrumentation with an unexpected timbre to spark a new vibe.",
-                ]
-            ),
+            self._choice(_CREATIVE_DIRECTIONS),
             context.suggested_focus(),
             context.groove_tip(),
         ]
 
+        if show_features or show_json:
+            from .analysis import features_to_json
+
         if show_features:
             outline.extend([
                 "",
                 "📊 Feature Summary",
-                json.dumps(context.features, indent=2, sort_keys=True),
+                features_to_json(context.features),
             ])
         elif show_json:
             outline.extend([
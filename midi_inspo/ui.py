@@ -5,7 +5,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Callable, Optional
 
-from .analysis import MidiFeatureError, extract_features
 from .ideas import InspirationGenerator
 
 
@@ -91,6 +90,9 @@ class MidiInspirationApp:
         if not path:
             self.deps.messagebox.showinfo("No file selected", "Choose a MIDI file to analyze.")
             return
+
+        from .analysis import MidiFeatureError, extract_features
+
         try:
             features = extract_features(path)
         except MidiFeatureError as exc:
@@ -1,6 +1,33 @@
 import pathlib
+import struct
 import sys
 
+import pytest
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_feature_cache(monkeypatch, tmp_path):
+    """Keep the on-disk feature cache out of the user's home directory."""
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def _chunk(name: bytes, data: bytes) -> bytes:
+    return name + struct.pack(">I", len(data)) + data
+
+
+def _midi(*tracks: bytes, format_type: int = 1, declared: int | None = None) -> bytes:
+    count = len(tracks) if declared is None else declared
+    header = _chunk(b"MThd", struct.pack(">HHH", format_type, count, 480))
+    return header + b"".join(_chunk(b"MTrk", track) for track in tracks)
+
+
+@pytest.fixture
+def midi_bytes():
+    """Build Standard MIDI file bytes from raw ``MTrk`` track payloads."""
+
+    return _midi
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from midi_inspo import analysis
+from midi_inspo.analysis import (
+    MidiFeatureError,
+    _parse_track,
+    extract_features,
+    extract_features_many,
+    features_to_json,
+)
+
+
+# Two note-ons (one via running status), a zero-velocity note-on, a program
+# change, a multi-byte delta time and an end-of-track meta event.
+TRACK = bytes(
+    [
+        0x00, 0x90, 0x3C, 0x40,
+        0x00, 0x3E, 0x40,
+        0x81, 0x40, 0x90, 0x3C, 0x00,
+        0x00, 0xC1, 0x05,
+        0x00, 0xFF, 0x2F, 0x00,
+    ]
+)
+
+
+def test_parse_track_counts_note_ons_and_flags_statuses():
+    seen_status = bytearray(256)
+    assert _parse_track(TRACK, 0, len(TRACK), seen_status) == 2
+    assert [b for b in range(256) if seen_status[b]] == [0x90, 0xC1, 0xFF]
+
+
+def test_extract_features_summarises_tracks(tmp_path, midi_bytes):
+    path = tmp_path / "song.mid"
+    path.write_bytes(midi_bytes(TRACK, TRACK, declared=3))
+
+    features = extract_features(str(path))
+
+    assert features["format_type"] == 1
+    assert features["tracks_declared"] == 3
+    assert features["tracks_observed"] == 2
+    assert features["track_consistency"] is False
+    assert features["track_lengths"] == [len(TRACK), len(TRACK)]
+    assert features["note_on_events"] == [2, 2]
+    assert features["distinct_status_bytes"] == [0x90, 0xC1, 0xFF]
+    assert features["density"] == 2
+
+
+def test_extract_features_reuses_cached_result(tmp_path, midi_bytes):
+    path = tmp_path / "song.mid"
+    path.write_bytes(midi_bytes(TRACK))
+
+    first = extract_features(str(path))
+    cache_files = list((tmp_path / "cache" / "midi-inspo").glob("*.json"))
+    assert len(cache_files) == 1
+
+    # A cache hit returns the stored dictionary without re-parsing the file.
+    cache_files[0].write_text(json.dumps(dict(first, density=99)))
+    assert extract_features(str(path))["density"] == 99
+    assert extract_features(str(path), use_cache=False) == first
+
+    # Refreshing re-parses the file and rewrites the stale entry.
+    assert extract_features(str(path), refresh_cache=True) == first
+    assert json.loads(cache_files[0].read_text()) == first
+
+
+def test_extract_features_rejects_non_midi(tmp_path):
+    path = tmp_path / "not.mid"
+    path.write_bytes(b"RIFF" + b"\x00" * 10)
+
+    with pytest.raises(MidiFeatureError):
+        extract_features(str(path))
+
+
+def test_extract_features_many_preserves_order_and_errors(tmp_path, midi_bytes):
+    one = tmp_path / "one.mid"
+    one.write_bytes(midi_bytes(TRACK))
+    two = tmp_path / "two.mid"
+    two.write_bytes(midi_bytes(TRACK, TRACK))
+    broken = tmp_path / "broken.mid"
+    broken.write_bytes(b"MThd")
+    paths = [str(two), str(broken), str(one)]
+
+    results = extract_features_many(paths, workers=2, return_exceptions=True)
+
+    assert results[0] == extract_features(str(two))
+    assert isinstance(results[1], MidiFeatureError)
+    assert results[2] == extract_features(str(one))
+    # Read failures such as a directory are reported like any other bad file.
+    assert isinstance(
+        extract_features_many([str(tmp_path)], return_exceptions=True)[0], MidiFeatureError
+    )
+    with pytest.raises(MidiFeatureError):
+        extract_features_many(paths, workers=2)
+
+
+def test_features_to_json_layout_is_backend_independent(tmp_path, monkeypatch, midi_bytes):
+    path = tmp_path / "song.mid"
+    path.write_bytes(midi_bytes(TRACK, b""))
+    features = extract_features(str(path))
+    expected = json.dumps(features, indent=2, sort_keys=True)
+
+    assert features_to_json(features) == expected
+    monkeypatch.setattr(analysis, "orjson", None)
+    assert features_to_json(features) == expected
+
+
+def test_extract_features_many_prefetches_only_cache_misses(tmp_path, monkeypatch, midi_bytes):
+    cached = tmp_path / "cached.mid"
+    cached.write_bytes(midi_bytes(TRACK))
+    fresh = tmp_path / "fresh.mid"
+    fresh.write_bytes(midi_bytes(TRACK, TRACK))
+    extract_features(str(cached))
+
+    prefetched = []
+    monkeypatch.setattr(analysis, "_prefetch", prefetched.extend)
+    extract_features_many([str(cached), str(fresh)], workers=1)
+
+    assert prefetched == [str(fresh)]
@@ -1,3 +1,5 @@
+import json
+import os
 import types
 
 import pytest
@@ -91,6 +93,15 @@ def test_cli_ui_flag_invokes_helper(monkeypatch):
     assert called["value"] is True
 
 
+def test_cli_bare_ui_flag_skips_argument_parser(monkeypatch):
+    def fail_build_parser():
+        raise AssertionError("argument parser should not be built for a bare --ui")
+
+    monkeypatch.setattr(cli, "build_parser", fail_build_parser)
+    monkeypatch.setattr(cli, "launch_ui", lambda: 0)
+    assert cli.main(["--ui"]) == 0
+
+
 @pytest.mark.parametrize("show_features,show_json", [(False, False), (True, False)])
 def test_create_app_builds_interface(show_features, show_json):
     deps = UiDependencies(
@@ -116,3 +127,49 @@ def test_create_app_builds_interface(show_features, show_json):
     assert deps.messagebox.messages
 
 
+# A single note-on followed by the end-of-track meta event.
+NOTE_TRACK = bytes([0x00, 0x90, 0x3C, 0x40, 0x00, 0xFF, 0x2F, 0x00])
+
+
+def test_cli_batch_rejects_positional_file(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main(["--batch", str(tmp_path), str(tmp_path / "song.mid")])
+
+
+def test_cli_batch_reports_each_file(tmp_path, capsys, midi_bytes):
+    (tmp_path / "good.mid").write_bytes(midi_bytes(NOTE_TRACK))
+    (tmp_path / "bad.mid").write_bytes(b"not a midi file")
+    (tmp_path / "sub.mid").mkdir()
+    (tmp_path / "notes.txt").write_text("ignored")
+    if hasattr(os, "mkfifo"):
+        os.mkfifo(tmp_path / "pipe.mid")
+
+    exit_code = cli.main(["--batch", str(tmp_path)])
+    out, err = capsys.readouterr()
+
+    assert exit_code == 1
+    assert f"== {tmp_path / 'bad.mid'} ==" in out
+    assert f"== {tmp_path / 'good.mid'} ==" in out
+    assert "MIDI Snapshot" in out
+    assert "sub.mid" not in out and "pipe.mid" not in out and "notes.txt" not in out
+    assert f"Error extracting features from {tmp_path / 'bad.mid'}" in err
+
+
+def test_cli_cache_flags(tmp_path, capsys, midi_bytes):
+    path = tmp_path / "song.mid"
+    path.write_bytes(midi_bytes(NOTE_TRACK))
+    cache_dir = tmp_path / "cache" / "midi-inspo"
+
+    assert cli.main(["--no-cache", str(path)]) == 0
+    assert not cache_dir.exists()
+
+    assert cli.main([str(path)]) == 0
+    (entry,) = cache_dir.glob("*.json")
+    entry.write_text(json.dumps(dict(json.loads(entry.read_text()), format_type=7)))
+    capsys.readouterr()
+
+    cli.main([str(path)])
+    assert "Format 7" in capsys.readouterr().out
+    cli.main(["--refresh-cache", str(path)])
+    assert "Format 1" in capsys.readouterr().out
+    assert json.loads(entry.read_text())["format_type"] == 1